@@ -5,6 +5,8 @@ from mojo.extensions import (
     setExtensionDefault
 )
 from mojo.events import postEvent
+from AppKit import NSTimer
+from Quartz import CGPathAddLines, CGPathCloseSubpath, CGPathCreateMutable
 from mojo.subscriber import (
     Subscriber,
     registerGlyphEditorSubscriber,
@@ -16,7 +18,10 @@ from mojo.UI import (
     setGlyphViewDisplaySettings
 )
 from fontTools.pens.basePen import BasePen
-from fontTools.pens.recordingPen import RecordingPen
+from fontTools.pens.recordingPen import (
+    RecordingPen,
+    replayRecording
+)
 from fontPens.flattenPen import (
     SamplingPen,
     FlattenPen
@@ -24,18 +29,28 @@ from fontPens.flattenPen import (
 from fontPens.penTools import (
     estimateCubicCurveLength,
     distance,
-    interpolatePoint,
-    getCubicPoint,
     getQuadraticPoint
 )
 from defcon.objects.glyph import Glyph
 import ezui
 from fontTools.misc.bezierTools import calcCubicArcLength
-from itertools import product
+from functools import lru_cache
+import numpy as np
 import os
 import math
 import random
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    # numba isn't part of RoboFont, without it the kernels simply run as Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 '''
 CHANGE LOG:
     0.2.7
@@ -63,8 +78,6 @@ CHANGE LOG:
 
 KNOWN BUGS:
     02/11 - Cutting an object from a glyph breaks everything because points' identifier are lost
-          - If `Distance` value is larger than one of segments and error is thrown:
-                • To get around this we need to just break that glyph into smaller groups
 
 
 DESCRIPTION:
@@ -142,7 +155,94 @@ DRAW_EVENT_KEY = KEY + ".drawEventChanged"
 LAYER          = "StrokeScribbler.drawing"
 CONTAINER_KEY  = KEY + ".container"
 COLOR_KEY      = KEY + ".color"
+PERLIN_TILE    = (1000/600, 1000/600)
+SELECTED_COLOR = (0, 0, 1, 1)
+
+
+def interpolateLine(pt0, pt1, steps):
+    """
+    Return the `steps` points evenly spaced from `pt0` (excluded) to `pt1` (included)
+    as an (steps, 2) array, computed in one go rather than one `interpolatePoint` per step
+    """
+    cur = np.array(pt0, dtype=float)
+    tgt = np.array(pt1, dtype=float)
+    ts = np.linspace(1.0 / steps, 1.0, steps)[:, None]
+    return cur + ts * (tgt - cur)
+
+
+@lru_cache(maxsize=128)
+def bernsteinBasis(steps):
+    """
+    (steps, 4) matrix of the cubic Bernstein weights at t = 1/steps ... 1.
+    Step counts repeat a lot from one curve (and one redraw) to the next so
+    the matrices are cached, read-only
+    """
+    t = np.linspace(1.0 / steps, 1.0, steps)
+    u = 1 - t
+    basis = np.stack([u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t], axis=1)
+    basis.setflags(write=False)
+    return basis
+
+
+def cubicPoints(pt0, pt1, pt2, pt3, steps):
+    """
+    Return the `steps` points at evenly spaced t values of a cubic, from `pt0` (excluded)
+    to `pt3` (included), as an (steps, 2) array: one matrix product instead
+    of one `getCubicPoint` per step
+    """
+    return bernsteinBasis(steps) @ np.array((pt0, pt1, pt2, pt3), dtype=float)
+
+
+@lru_cache(maxsize=4096)
+def cubicLength(pt0, pt1, pt2, pt3):
+    """
+    `estimateCubicCurveLength`, remembered per curve since dragging the
+    distance slider measures the very same cubics over and over
+    """
+    return estimateCubicCurveLength(pt0, pt1, pt2, pt3)
+
+
+def cubicFlatness(pt0, pt1, pt2, pt3):
+    """
+    Largest distance from the off-curve points of a cubic to its chord.
+    The curve lies inside its control polygon so it never strays further than
+    this from the straight line pt0 -> pt3
+    """
+    dx = pt3[0] - pt0[0]
+    dy = pt3[1] - pt0[1]
+    chord2 = dx * dx + dy * dy
+    flatness = 0
+    for pt in (pt1, pt2):
+        px = pt[0] - pt0[0]
+        py = pt[1] - pt0[1]
+        t = (px * dx + py * dy) / chord2 if chord2 else 0
+        # Off-curves behind either end point make the curve overshoot the chord
+        t = min(max(t, 0), 1)
+        flatness = max(flatness, math.hypot(px - t * dx, py - t * dy))
+    return flatness
+
+
+class BatchPen(object):
+    """
+    Wraps a pen to add `lineToMany`, which hands a whole run of points
+    (an (n, 2) array or any iterable of points) to the pen in one call.
+    Everything else is forwarded to the wrapped pen
+    """
+
+    def __init__(self, pen):
+        self.pen = pen
+        self.lineTo = pen.lineTo
 
+    def __getattr__(self, attr):
+        return getattr(self.pen, attr)
+
+    def lineToMany(self, points):
+        if isinstance(points, np.ndarray):
+            # One conversion to Python floats for the whole array
+            points = points.tolist()
+        lineTo = self.lineTo
+        for x, y in points:
+            lineTo((x, y))
 
 
 class StrokeFlattener(BasePen):
@@ -152,12 +252,15 @@ class StrokeFlattener(BasePen):
     will sample the glyph but if you give it an integer it will distance
     """
 
+    # Fraction of `approximateSegmentLength` under which a curve piece counts as flat
+    flatnessFactor = 0.05
+
     def __init__(self, otherPen, approximateSegmentLength=5, segmentLines=False, filterDoubles=True):
         
         self.reference = True if isinstance(approximateSegmentLength, dict) else False
         self.approximateSegmentLength = approximateSegmentLength
         BasePen.__init__(self, {})
-        self.otherPen = otherPen
+        self.otherPen = otherPen if hasattr(otherPen, "lineToMany") else BatchPen(otherPen)
         self.currentPt = None
         self.firstPt = None
         self.segmentLines = segmentLines
@@ -179,9 +282,7 @@ class StrokeFlattener(BasePen):
                
         if self.reference:
             steps = self.approximateSegmentLength[self.index] 
-            step = 1.0 / steps
-            for factor in range(1, steps + 1):
-                self.otherPen.lineTo(interpolatePoint(self.currentPt, pt, factor * step))
+            self.otherPen.lineToMany(interpolateLine(self.currentPt, pt, steps))
             self.currentPt = pt
             
         else:
@@ -190,15 +291,12 @@ class StrokeFlattener(BasePen):
             if maxSteps < 1:
                 self.otherPen.lineTo(pt)
                 self.currentPt = pt
+                self.segmentRefrenceMap[self.index] = 1
                 return
-            step = 1.0 / maxSteps
-            p = 0
-            for factor in range(1, maxSteps + 1):
-                self.otherPen.lineTo(interpolatePoint(self.currentPt, pt, factor * step))
-                p += 1
+            self.otherPen.lineToMany(interpolateLine(self.currentPt, pt, maxSteps))
 
             self.currentPt = pt
-            self.segmentRefrenceMap[self.index] = p
+            self.segmentRefrenceMap[self.index] = maxSteps
             
 
     def _curveToOne(self, pt1, pt2, pt3):
@@ -211,37 +309,39 @@ class StrokeFlattener(BasePen):
         self.index += 1
             
         if self.reference:
-            falseCurve = (pt1 == self.currentPt) and (pt2 == pt3)
-            if falseCurve:
-                self._lineTo(pt3)
-                return
-                
             steps = self.approximateSegmentLength[self.index] 
-            step = 1.0 / steps
-            for factor in range(1, steps + 1):
-                pt = getCubicPoint(factor * step, self.currentPt, pt1, pt2, pt3)
-                self.otherPen.lineTo(pt)
+            self.otherPen.lineToMany(cubicPoints(self.currentPt, pt1, pt2, pt3, steps))
             self.currentPt = pt3
            
         else:
-            est = estimateCubicCurveLength(self.currentPt, pt1, pt2, pt3) / self.approximateSegmentLength
+            # The control polygon is never shorter than the curve, if it is under
+            # 1.5 steps the curve rounds to (at most) a single step: its end point
+            if distance(self.currentPt, pt1) + distance(pt1, pt2) + distance(pt2, pt3) < 1.5 * self.approximateSegmentLength:
+                self.otherPen.lineTo(pt3)
+                self.currentPt = pt3
+                self.segmentRefrenceMap[self.index] = 1
+                return
+            # A flat enough curve is as long as its chord, only measure the
+            # ones that actually bend
+            if cubicFlatness(self.currentPt, pt1, pt2, pt3) < self.approximateSegmentLength * self.flatnessFactor:
+                length = distance(self.currentPt, pt3)
+            else:
+                length = cubicLength(tuple(self.currentPt), tuple(pt1), tuple(pt2), tuple(pt3))
+            est = length / self.approximateSegmentLength
             maxSteps = int(round(est))
             if maxSteps < 1:
                 self.otherPen.lineTo(pt3)
                 self.currentPt = pt3
+                self.segmentRefrenceMap[self.index] = 1
                 return
-            step = 1.0 / maxSteps
-            p = 0
-            for factor in range(1, maxSteps + 1):
-                pt = getCubicPoint(factor * step, self.currentPt, pt1, pt2, pt3)
-                self.otherPen.lineTo(pt)
-                p += 1
+            self.otherPen.lineToMany(cubicPoints(self.currentPt, pt1, pt2, pt3, maxSteps))
             self.currentPt = pt3
-            self.segmentRefrenceMap[self.index] = p
+            self.segmentRefrenceMap[self.index] = maxSteps
 
 
     def _closePath(self):
-        self.lineTo(self.firstPt)
+        if self.currentPt != self.firstPt:
+            self.lineTo(self.firstPt)
         self.otherPen.closePath()
         self.currentPt = None
 
@@ -261,18 +361,33 @@ Perlin Noise Implimentation by Roberto Arista
 def smoothstep(t):
     return t * t * (3. - 2. * t)
 
+
+# `smoothstep` sampled over [0, 1], noise only needs it to 1/1024th precision.
+# The kernels index the array, the Python paths the (faster to index) list
+SMOOTH_STEPS = 1024
+_SMOOTH_LUT = smoothstep(np.linspace(0, 1, SMOOTH_STEPS + 1))
+_SMOOTH_LUT_LIST = _SMOOTH_LUT.tolist()
+
 def lerp(t, a, b):
     return a + t * (b - a)
 
-def calcAngle(pt1, pt2):
-    return math.atan2((pt2[1] - pt1[1]), (pt2[0] - pt1[0]))
-
 def calcMidPoint(pt1, pt2):
     xMid = lerp(.5, pt1[0], pt2[0])
     yMid = lerp(.5, pt1[1], pt2[1])
     return xMid, yMid
 
 
+def midPoints(points):
+    # `calcMidPoint` of every edge of the (n, 2) polyline `points`
+    return points[1:] + .5 * (points[:-1] - points[1:])
+
+
+# The noise used to be pushed along `angle + 90`, with the angle in radians.
+# That rotation is kept as is so scribbles look the same, just precomputed
+_NOISE_COS = math.cos(90)
+_NOISE_SIN = math.sin(90)
+
+
 class PerlinPen(BasePen):
 
     def __init__(self, otherPen, intensity,
@@ -289,14 +404,33 @@ class PerlinPen(BasePen):
         self.firstPt = self.lastPt = pt
 
     def _lineTo(self, pt):
-        midPt = calcMidPoint(pt, self.lastPt)
-        angle = calcAngle(pt, self.lastPt)
+        lastPt = self.lastPt
+        pnf = self.pnf
+        midPt = calcMidPoint(pt, lastPt)
+        intensity = self.intensity
+        if not intensity:
+            # Noise that moves nothing, the midpoints are all that's left
+            self.otherPen.lineTo(midPt)
+            self.lastPt = pt
+            return
         if self.fixedParameters:
-            noise = self.pnf(midPt[0], midPt[1], *self.fixedParameters)
+            noise = pnf(midPt[0], midPt[1], *self.fixedParameters)
         else:
-            noise = self.pnf(midPt[0], midPt[1])
-        xx = midPt[0] + math.cos(angle+90) * self.intensity*noise
-        yy = midPt[1] + math.sin(angle+90) * self.intensity*noise
+            noise = pnf(midPt[0], midPt[1])
+        # Unit vector of the edge (pt -> lastPt) rotated by a constant angle,
+        # no need for atan2/cos/sin on every edge
+        dx = lastPt[0] - pt[0]
+        dy = lastPt[1] - pt[1]
+        length = math.hypot(dx, dy)
+        if length:
+            ux = dx / length
+            uy = dy / length
+        else:
+            ux, uy = 1.0, 0.0
+        nx = ux * _NOISE_COS - uy * _NOISE_SIN
+        ny = uy * _NOISE_COS + ux * _NOISE_SIN
+        xx = midPt[0] + nx * intensity * noise
+        yy = midPt[1] + ny * intensity * noise
 
         self.otherPen.lineTo((xx, yy))
         self.lastPt = pt
@@ -305,7 +439,10 @@ class PerlinPen(BasePen):
         raise NotImplementedError
 
     def _closePath(self):
-        self.lineTo(self.firstPt)
+        # A contour that already came back to its start (as StrokeFlattener
+        # draws them) has its closing edge displaced already
+        if self.lastPt != self.firstPt:
+            self.lineTo(self.firstPt)
         self.otherPen.closePath()
         self.lastPt = None
 
@@ -314,17 +451,165 @@ class PerlinPen(BasePen):
         self.lastPt = None
 
 
+class ArrayPerlinPen(BasePen):
+    """
+    `PerlinPen` for factories that can `displace` whole polylines: the points
+    of a contour are buffered and displaced in one call when it ends
+    """
+
+    def __init__(self, otherPen, intensity, factory):
+        BasePen.__init__(self, {})
+        self.otherPen = BatchPen(otherPen)
+        self.pnf = factory
+        self.intensity = intensity
+        self.points = None
+
+    def _moveTo(self, pt):
+        self.points = [pt]
+
+    def _lineTo(self, pt):
+        self.points.append(pt)
+
+    def lineToMany(self, points):
+        if isinstance(points, np.ndarray):
+            points = points.tolist()
+        self.points.extend(points)
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        raise NotImplementedError
+
+    def _flush(self):
+        points = np.array(self.points, dtype=np.float64)
+        self.otherPen.moveTo(self.points[0])
+        if self.intensity:
+            self.otherPen.lineToMany(self.pnf.displace(points, self.intensity))
+        else:
+            self.otherPen.lineToMany(midPoints(points))
+        self.points = None
+
+    def _closePath(self):
+        first = self.points[0]
+        last = self.points[-1]
+        # PerlinPen closes with a line back to the first point
+        if last[0] != first[0] or last[1] != first[1]:
+            self.points.append(first)
+        self._flush()
+        self.otherPen.closePath()
+
+    def _endPath(self):
+        self._flush()
+        self.otherPen.endPath()
+
+
+def perlinPen(otherPen, intensity, factory, fixedParameters=None):
+    # The numba backed pen when the factory supports it
+    if fixedParameters is None and factory.canDisplace():
+        return ArrayPerlinPen(otherPen, intensity, factory)
+    return PerlinPen(otherPen, intensity, factory, fixedParameters)
+
+
 def perlinGlyph(aGlyph, intensity, factory, fixedParameters=None):
     if len(aGlyph) == 0:
         return aGlyph
     recorder = RecordingPen()
-    filterpen = PerlinPen(recorder, intensity, factory, fixedParameters)
+    filterpen = perlinPen(recorder, intensity, factory, fixedParameters)
     aGlyph.draw(filterpen)
     aGlyph.clear()
     recorder.replay(aGlyph.getPen())
     return aGlyph
 
 
+@njit(cache=True)
+def _perlin2d(x, y, grad_table, offset_x, offset_y, octaves, tile_x, tile_y, unbias, scale_factor):
+    """
+    `PerlinNoiseFactory.__call__` for 2D noise with every gradient already in
+    `grad_table`, cell (i, j) being stored at [i - offset_x, j - offset_y].
+    Compiled by numba when it is available
+    """
+    ret = 0.0
+    o2 = 1
+    for _ in range(octaves):
+        px = x * o2
+        py = y * o2
+        if tile_x:
+            px %= tile_x * o2
+        if tile_y:
+            py %= tile_y * o2
+        x0 = math.floor(px)
+        y0 = math.floor(py)
+        fx = px - x0
+        fy = py - y0
+        i = int(x0) - offset_x
+        j = int(y0) - offset_y
+        d00 = grad_table[i, j, 0] * fx + grad_table[i, j, 1] * fy
+        d01 = grad_table[i, j + 1, 0] * fx + grad_table[i, j + 1, 1] * (fy - 1)
+        d10 = grad_table[i + 1, j, 0] * (fx - 1) + grad_table[i + 1, j, 1] * fy
+        d11 = grad_table[i + 1, j + 1, 0] * (fx - 1) + grad_table[i + 1, j + 1, 1] * (fy - 1)
+        sx = _SMOOTH_LUT[int(fx * SMOOTH_STEPS)]
+        sy = _SMOOTH_LUT[int(fy * SMOOTH_STEPS)]
+        a = d00 + sy * (d01 - d00)
+        b = d10 + sy * (d11 - d10)
+        ret += (a + sx * (b - a)) * scale_factor / o2
+        o2 *= 2
+    ret /= 2 - 2.0 ** (1 - octaves)
+    if unbias:
+        r = (ret + 1) / 2
+        for _ in range(int(octaves / 2 + 0.5)):
+            r = _SMOOTH_LUT[min(max(int(r * SMOOTH_STEPS), 0), SMOOTH_STEPS)]
+        ret = r * 2 - 1
+    return ret
+
+
+@njit(cache=True)
+def _perlin_displace(points, intensity, grad_table, octaves, tile_x, tile_y, unbias, scale_factor):
+    """
+    What `PerlinPen` draws for the polyline `points`: the midpoint of every
+    edge, pushed along the rotated edge direction by the tiled 2D noise there
+    """
+    count = len(points) - 1
+    out = np.empty((count, 2))
+    for k in range(count):
+        lastX = points[k, 0]
+        lastY = points[k, 1]
+        x = points[k + 1, 0]
+        y = points[k + 1, 1]
+        midX = x + .5 * (lastX - x)
+        midY = y + .5 * (lastY - y)
+        noise = _perlin2d(midX, midY, grad_table, 0, 0, octaves, tile_x, tile_y, unbias, scale_factor)
+        dx = lastX - x
+        dy = lastY - y
+        length = math.hypot(dx, dy)
+        if length:
+            ux = dx / length
+            uy = dy / length
+        else:
+            ux = 1.0
+            uy = 0.0
+        nx = ux * _NOISE_COS - uy * _NOISE_SIN
+        ny = uy * _NOISE_COS + ux * _NOISE_SIN
+        out[k, 0] = midX + nx * intensity * noise
+        out[k, 1] = midY + ny * intensity * noise
+    return out
+
+
+@njit(cache=True)
+def _stitch(ps1, ps2, offset):
+    """
+    The squiggle between two flattened contours: the first point of `ps1`, then
+    alternately the `offset` shifted point of `ps2` and the point of `ps1`, as
+    far as both contours go
+    """
+    count = max(0, min(len(ps1), len(ps2) - offset))
+    stitched = np.empty((2 * count + 1, 2))
+    stitched[0] = ps1[0]
+    stitched[1::2] = ps2[offset:offset + count]
+    stitched[2::2] = ps1[:count]
+    return stitched
+
+
+GRADIENT_BATCH = 1024
+
+
 class PerlinNoiseFactory(object):
     def __init__(self, dimension, octaves=1, tile=(), unbias=False):
         self.dimension = dimension
@@ -333,64 +618,171 @@ class PerlinNoiseFactory(object):
         self.unbias = unbias
         self.scale_factor = 2 * dimension ** -0.5
         self.gradient = {}
+        self._grad_pool = []
+        self._grad_index = 0
+        self._grad_grid = None
+        # The extension only ever asks for 2D noise so the common low dimensions
+        # get a closed form instead of the generic corner loops
+        if dimension == 1:
+            self._plain_noise = self._plain_noise_1d
+        elif dimension == 2:
+            self._plain_noise = self._plain_noise_2d
+            if all(self.tile[:2]):
+                # Tiled noise never leaves [0, tile * 2 ** octave) so all of its
+                # gradients fit in a small (x, y, 2) array. It is filled up front 
+                # so the whole octave loop can run in `_perlin2d`.
+                # Untiled noise is unbounded and keeps the lazy dict
+                top = 2 ** (octaves - 1)
+                width = int(math.ceil(self.tile[0] * top)) + 2
+                height = int(math.ceil(self.tile[1] * top)) + 2
+                self._grad_grid = self._random_gradients(width * height).reshape(width, height, 2)
+        else:
+            self._plain_noise = self.get_plain_noise
+
+        # Per octave scale and tile periods (0 for untiled axes), and the
+        # normalisation of their sum, for `_octave_noise`
+        self._octaves = tuple(
+            (1 << o, tuple(t * (1 << o) for t in self.tile[:dimension]))
+            for o in range(octaves)
+        )
+        self._octave_denominator = 2 - 2 ** (1 - octaves)
+
+        # Pick the evaluator once rather than branching on every sample
+        if self._grad_grid is not None:
+            self._eval = self._tiled_noise_2d
+        elif octaves == 1 and not any(self.tile) and not unbias:
+            # A single untiled octave is the plain noise as is, the octave
+            # loop would only scale by 1 and divide by 2 - 2 ** 0 = 1
+            self._eval = self._plain_noise
+        else:
+            self._eval = self._octave_noise
+
+    def _random_gradients(self, count):
+        # Random unit vectors, normalised gaussians are uniform on the sphere
+        gradients = np.random.standard_normal((count, self.dimension))
+        gradients /= np.linalg.norm(gradients, axis=1, keepdims=True)
+        return gradients
 
     def _generate_gradient(self):
         if self.dimension == 1:
             return (random.uniform(-1, 1),)
-        random_point = [random.gauss(0, 1) for _ in range(self.dimension)]
-        scale = sum(n * n for n in random_point) ** -0.5
-        return tuple(coord * scale for coord in random_point)
+        # Gradients are drawn in batches, one numpy call instead of `dimension`
+        # `random.gauss` calls every time a new grid cell is hit
+        if self._grad_index >= len(self._grad_pool):
+            self._grad_pool = self._random_gradients(GRADIENT_BATCH).tolist()
+            self._grad_index = 0
+        gradient = self._grad_pool[self._grad_index]
+        self._grad_index += 1
+        return tuple(gradient)
 
     def get_plain_noise(self, *point):
         if len(point) != self.dimension:
             raise ValueError("Expected {} values, got {}".format(
                 self.dimension, len(point)))
-        grid_coords = []
-        for coord in point:
-            min_coord = math.floor(coord)
-            max_coord = min_coord + 1
-            grid_coords.append((min_coord, max_coord))
-        dots = []
-        for grid_point in product(*grid_coords):
-            if grid_point not in self.gradient:
-                self.gradient[grid_point] = self._generate_gradient()
-            gradient = self.gradient[grid_point]
+        dim = self.dimension
+        grid_mins = [math.floor(coord) for coord in point]
+        # Corner `c` takes the max coordinate on dimension k when bit
+        # (dim - 1 - k) of c is set: the first dimension varies slowest
+        dots = [0.0] * (1 << dim)
+        for corner in range(1 << dim):
+            grid_point = tuple(
+                grid_mins[k] + ((corner >> (dim - 1 - k)) & 1) for k in range(dim)
+            )
+            gradient = self._get_gradient(grid_point)
             dot = 0
-            for i in range(self.dimension):
+            for i in range(dim):
                 dot += gradient[i] * (point[i] - grid_point[i])
-            dots.append(dot)
-        dim = self.dimension
-        while len(dots) > 1:
-            dim -= 1
-            s = smoothstep(point[dim] - grid_coords[dim][0])
-            next_dots = []
-            while dots:
-                next_dots.append(lerp(s, dots.pop(0), dots.pop(0)))
-            dots = next_dots
+            dots[corner] = dot
+        # Neighbouring corners only differ on the last remaining dimension,
+        # fold them pairwise in place
+        for k in range(dim - 1, -1, -1):
+            s = _SMOOTH_LUT_LIST[int((point[k] - grid_mins[k]) * SMOOTH_STEPS)]
+            for i in range(1 << k):
+                dots[i] = lerp(s, dots[2 * i], dots[2 * i + 1])
         return dots[0] * self.scale_factor
 
+    def _get_gradient(self, grid_point):
+        gradient = self.gradient.get(grid_point)
+        if gradient is None:
+            gradient = self.gradient[grid_point] = self._generate_gradient()
+        return gradient
+
+    def _plain_noise_1d(self, x):
+        x0 = math.floor(x)
+        fx = x - x0
+        d0 = self._get_gradient((x0,))[0] * fx
+        d1 = self._get_gradient((x0 + 1,))[0] * (fx - 1)
+        return lerp(_SMOOTH_LUT_LIST[int(fx * SMOOTH_STEPS)], d0, d1) * self.scale_factor
+
+    def _plain_noise_2d(self, x, y):
+        x0 = math.floor(x)
+        y0 = math.floor(y)
+        fx = x - x0
+        fy = y - y0
+        # Same corner order as `get_plain_noise`
+        g00 = self._get_gradient((x0, y0))
+        g01 = self._get_gradient((x0, y0 + 1))
+        g10 = self._get_gradient((x0 + 1, y0))
+        g11 = self._get_gradient((x0 + 1, y0 + 1))
+        d00 = g00[0] * fx + g00[1] * fy
+        d01 = g01[0] * fx + g01[1] * (fy - 1)
+        d10 = g10[0] * (fx - 1) + g10[1] * fy
+        d11 = g11[0] * (fx - 1) + g11[1] * (fy - 1)
+        sx = _SMOOTH_LUT_LIST[int(fx * SMOOTH_STEPS)]
+        sy = _SMOOTH_LUT_LIST[int(fy * SMOOTH_STEPS)]
+        return lerp(sx, lerp(sy, d00, d01), lerp(sy, d10, d11)) * self.scale_factor
+
     def __call__(self, *point):
+        return self._eval(*point)
+
+    def canDisplace(self):
+        # Interpreted, the kernel is no faster than PerlinPen
+        return HAS_NUMBA and self._grad_grid is not None
+
+    def displace(self, points, intensity):
+        """
+        Displaced edge midpoints of an (n, 2) polyline, see `_perlin_displace`.
+        Only for tiled 2D factories, check `canDisplace` first
+        """
+        return _perlin_displace(
+            points, intensity, self._grad_grid,
+            self.octaves, self.tile[0], self.tile[1], self.unbias, self.scale_factor
+        )
+
+    def _tiled_noise_2d(self, x, y):
+        return _perlin2d(
+            x, y, self._grad_grid, 0, 0,
+            self.octaves, self.tile[0], self.tile[1], self.unbias, self.scale_factor
+        )
+
+    def _octave_noise(self, *point):
+        # zip() below would quietly drop any extra coordinate
+        if len(point) != self.dimension:
+            raise ValueError("Expected {} values, got {}".format(
+                self.dimension, len(point)))
         ret = 0
-        for o in range(self.octaves):
-            o2 = 1 << o
+        plain_noise = self._plain_noise
+        for o2, periods in self._octaves:
             new_point = []
-            for i, coord in enumerate(point):
+            for coord, period in zip(point, periods):
                 coord *= o2
-                if self.tile[i]:
-                    coord %= self.tile[i] * o2
+                if period:
+                    coord %= period
                 new_point.append(coord)
-            ret += self.get_plain_noise(*new_point) / o2
-        ret /= 2 - 2 ** (1 - self.octaves)
+            ret += plain_noise(*new_point) / o2
+        ret /= self._octave_denominator
         if self.unbias:
             r = (ret + 1) / 2
             for _ in range(int(self.octaves / 2 + 0.5)):
-                r = smoothstep(r)
+                r = _SMOOTH_LUT_LIST[min(max(int(r * SMOOTH_STEPS), 0), SMOOTH_STEPS)]
             ret = r * 2 - 1
         return ret
 
 
 def groupList(pairs):
-    return [pairs[i * 2:(i + 1) * 2] for i in range((len(pairs) + 2 - 1) // 2 )]  
+    # Consecutive pairs, an odd trailing item is dropped
+    it = iter(pairs)
+    return list(zip(it, it))
 
 
 def addPoints(pt0,pt1):
@@ -401,32 +793,32 @@ def subtractPoints(pt0,pt1):
     return (pt0[0] - pt1[0], pt0[1] - pt1[1])
 
 
-def IDtoRContours(glyph,ID):
-    allIDS = [(c,c.getIdentifier()) for c in glyph.contours]
-    rcs = []
-    for i in ID.split(" "):
-        for c in glyph.contours:
-            if c.identifier == i:
-                rcs.append(c)
-    return rcs
+def contourIdentifierMap(glyph):
+    return {c.identifier: c for c in glyph.contours}
+
+
+def IDtoRContours(glyph,ID,idmap=None):
+    # One pass over the contours instead of one per identifier, callers
+    # resolving several IDs can share the map
+    if idmap is None:
+        idmap = contourIdentifierMap(glyph)
+    return [idmap[i] for i in ID.split(" ") if i in idmap]
 
 
 def getContourPairs(glyph):
     contours = []
-    parsed = {}
-    if KEY in glyph.lib:
-        if glyph.lib[KEY] != {}:
-            for contourPair,item in glyph.lib[KEY].items():
-                if len(item) == 5:
-                    mid,segment,side,offset,random = item
-                    parsed[contourPair] = item
-                    conts = IDtoRContours(glyph,contourPair)
-                    # Currently we will just ignore any contour groups
-                    # that are don't have two contours
-                    # i.e if you delete one contour
-                    # should we also just delete that from the lib? Maybe...
-                    if len(conts) == 2:
-                        contours.append((conts,(mid,segment,side,offset,random)))
+    data = glyph.lib.get(KEY) or {}
+    idmap = contourIdentifierMap(glyph) if data else {}
+    for contourPair, item in data.items():
+        if len(item) != 5:
+            continue
+        conts = IDtoRContours(glyph,contourPair,idmap)
+        # Currently we will just ignore any contour groups
+        # that are don't have two contours
+        # i.e if you delete one contour
+        # should we also just delete that from the lib? Maybe...
+        if len(conts) == 2:
+            contours.append((conts, tuple(item)))
     return contours
 
 
@@ -479,13 +871,99 @@ _random_symbol = ezui.makeImage(
             template=True
 )
 
+class EventCoalescer(object):
+    """
+    Collects the keyword arguments of `post` calls made less than `interval`
+    seconds apart and sends them as a single `postEvent(eventName, **kwargs)`
+    once the calls settle. Later values for the same key win
+    """
+
+    def __init__(self, eventName, interval=0.016):
+        self.eventName = eventName
+        self.interval = interval
+        self.pending = {}
+        self._timer = None
+
+    def post(self, **kwargs):
+        self.pending.update(kwargs)
+        if self._timer is not None:
+            self._timer.invalidate()
+        self._timer = NSTimer.scheduledTimerWithTimeInterval_repeats_block_(
+            self.interval, False, self._fire
+        )
+
+    def _fire(self, timer):
+        self._timer = None
+        kwargs, self.pending = self.pending, {}
+        if kwargs:
+            postEvent(self.eventName, **kwargs)
+
+    def cancel(self):
+        if self._timer is not None:
+            self._timer.invalidate()
+            self._timer = None
+        self.pending = {}
+
+
+class Throttle(object):
+    """
+    Runs `callback` on the first `call`, then at most once every `interval`
+    seconds while calls keep coming. A call made during the interval is
+    never lost, it runs when the interval ends
+    """
+
+    def __init__(self, callback, interval):
+        self.callback = callback
+        self.interval = interval
+        self.pending = False
+        self._timer = None
+
+    def call(self):
+        if self._timer is None:
+            self._run()
+        else:
+            self.pending = True
+
+    def _run(self):
+        self.pending = False
+        self.callback()
+        self._timer = NSTimer.scheduledTimerWithTimeInterval_repeats_block_(
+            self.interval, False, self._fire
+        )
+
+    def _fire(self, timer):
+        self._timer = None
+        if self.pending:
+            self._run()
+
+    def cancel(self):
+        if self._timer is not None:
+            self._timer.invalidate()
+            self._timer = None
+        self.pending = False
+
+
 class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
+    _eventsRegistered = False
+
+    def __init__(self, *args, **kwargs):
+        # The subscriber events have to exist before the window subscribes
+        if not StrokeScribblerWindowController._eventsRegistered:
+            registerEvents()
+            StrokeScribblerWindowController._eventsRegistered = True
+        super().__init__(*args, **kwargs)
+
+
     def build(self):
         self.settings  = []
         self.selected = None
         self.selectionIndexes = []
         self.fixing = False
+        self._contourPairs = None
+        self._contourPairsGlyph = None
+        # Dragging a slider fires far more often than the preview can redraw
+        self.sliderEvents = EventCoalescer(UI_EVENT_KEY)
 
         self.currentGlyph = CurrentGlyph()
 
@@ -692,11 +1170,24 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
 
     def destroy(self):
+        self.invalidateContourPairs()
+        self.sliderEvents.cancel()
         if self.fill: setGlyphViewDisplaySettings({'Fill': True})
         unregisterGlyphEditorSubscriber(StrokeScribblerDrawingBot)
         setExtensionDefault(SETTINGS_KEY, self.w.getItemValues())
     
  
+    def roboFontDidSwitchCurrentGlyph(self, info):
+        # Sliders write to this glyph, tracking it here saves a CurrentGlyph()
+        # lookup on every slider tick
+        glyph = info["glyph"]
+        if glyph is not None:
+            self.currentGlyph = glyph
+            self.invalidateContourPairs()
+            self.reselectTable()
+            self.rebuildTableItems(glyph)
+
+
     def colorWellCallback(self,sender):
         self.color = tuple(sender.get())
         postEvent(UI_EVENT_KEY, color_value=tuple(sender.get()))
@@ -712,12 +1203,13 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
                 c.selected = False
             if self.selected:
                 for curSel in self.selected:
-                    stp = getContourPairs(self.currentGlyph)
+                    stp = self.cachedContourPairs(self.currentGlyph)
                     si  = int(curSel["group_index"])
                     cps = stp[si][0]
+                    wanted = {r.getIdentifier() for r in cps}
 
                     for c in self.currentGlyph:
-                        if c.getIdentifier() in [r.getIdentifier() for r in cps]:
+                        if c.getIdentifier() in wanted:
                             c.selected = True
 
                     self.w.getItem("thicknessSlider").set(curSel["thickness_settings"])
@@ -731,17 +1223,15 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
 
     def thicknessSliderCallback(self,sender):
-        self.currentGlyph = CurrentGlyph()
         self.thickness = int(sender.get())
         self.setSelected((self.thickness, 0))
-        postEvent(UI_EVENT_KEY, thickness_value=sender.get())
+        self.sliderEvents.post(thickness_value=sender.get())
 
 
     def distanceSliderCallback(self,sender):
-        self.currentGlyph = CurrentGlyph()
         self.distance = int(sender.get())
         self.setSelected((self.distance, 1))
-        postEvent(UI_EVENT_KEY, distance_value=sender.get())
+        self.sliderEvents.post(distance_value=sender.get())
 
 
     def sideCallback(self,sender):
@@ -751,35 +1241,60 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
 
     def offsetSliderCallback(self,sender):
-        self.currentGlyph = CurrentGlyph()
         self.offset = int(sender.get())
         self.setSelected((self.offset, 3))
-        postEvent(UI_EVENT_KEY, offset_value=sender.get())
+        self.sliderEvents.post(offset_value=sender.get())
 
 
     def randomSliderCallback(self,sender):
-        self.currentGlyph = CurrentGlyph()
         self.random = int(sender.get())
         self.setSelected((self.random, 4))
-        postEvent(UI_EVENT_KEY, random_value=sender.get())
+        self.sliderEvents.post(random_value=sender.get())
+
+
+    def cachedContourPairs(self, glyph):
+        """
+        `getContourPairs` for `glyph`, only recomputed when the glyph is swapped
+        or after `invalidateContourPairs` (lib writes, glyph changes)
+        """
+        naked = glyph.naked()
+        if self._contourPairs is None or self._contourPairsGlyph is not naked:
+            self._contourPairs = getContourPairs(glyph)
+            self._contourPairsGlyph = naked
+        return self._contourPairs
+
+
+    def invalidateContourPairs(self):
+        self._contourPairs = None
+        self._contourPairsGlyph = None
 
 
     def setSelected(self, valIndex):
         value,index = valIndex
-        conts = getContourPairs(self.currentGlyph)
+        conts = self.cachedContourPairs(self.currentGlyph)
+        # Only settings of existing groups change, the cached pairs can be
+        # patched rather than parsed again
+        patched = True
         if self.selected:
+            lib = dict(self.currentGlyph.lib.get(KEY, {}))
             for group in self.selected:
 
-                gg = conts[int(group["group_index"])]
+                pairIndex = int(group["group_index"])
+                gg = conts[pairIndex]
                 ci = " ".join(sorted([b.getIdentifier() for b in gg[0]]))
 
-                lib = self.currentGlyph.lib[KEY]
                 v = list(gg[1])
                 v[index] = value
+                if ci not in lib:
+                    patched = False
                 lib[ci] = tuple(v)
+                conts[pairIndex] = (gg[0], tuple(v))
 
-                self.currentGlyph.lib[KEY] = lib
+            # A single lib write for the whole selection
+            self.currentGlyph.lib[KEY] = lib
 
+        if not patched:
+            self.invalidateContourPairs()
         self.currentGlyph.lib.changed()
         self.rebuildTableItems(self.currentGlyph)
 
@@ -787,7 +1302,7 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
     def rebuildTableItems(self, glyph):
         if glyph is not None:
             items = []
-            for i,s in enumerate(getContourPairs(glyph)):
+            for i,s in enumerate(self.cachedContourPairs(glyph)):
 
                 ir = dict(
                         group_index        = str(i) ,
@@ -834,6 +1349,7 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
             self.selectionIndexes = []
 
+        self.invalidateContourPairs()
         self.currentGlyph.lib.changed()
         self.rebuildTableItems(self.currentGlyph)
         postEvent(UI_EVENT_KEY, draw=True)
@@ -849,9 +1365,11 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
         drawLayer.clear()
         pen = drawLayer.getPen()
         for i, gs in enumerate(self.contours):
-            pen.moveTo(gs[0])
-            for s in gs[1:]:
-                pen.lineTo(s)
+            # (n, 2) arrays from the drawing bot, the glyph wants plain floats
+            points = gs.tolist()
+            pen.moveTo(tuple(points[0]))
+            for x, y in points[1:]:
+                pen.lineTo((x, y))
             pen.endPath()
 
 
@@ -861,7 +1379,7 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
     def reselectTable(self):
         self.fixing = True
-        stp = getContourPairs(self.currentGlyph)
+        stp = self.cachedContourPairs(self.currentGlyph)
         sel = []
         for io, cps in enumerate(stp):
             (c1,c2),_ = cps
@@ -875,9 +1393,14 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
         if info["contours"] is not None:
             self.contours = info["contours"]  
             self.reselectTable()
+        if info["selection_changed"]:
+            self.reselectTable()
         if info["reset_glyph"] is not None:
             self.currentGlyph = info["reset_glyph"]
-            self.selectionIndexes = []
+            self.invalidateContourPairs()
+            # The bot doesn't send contours again when they didn't change,
+            # so restore the selection here
+            self.reselectTable()
 
         self.rebuildTableItems(self.currentGlyph)
 
@@ -885,6 +1408,12 @@ class StrokeScribblerWindowController(Subscriber, ezui.WindowController):
 
 class StrokeScribblerDrawingBot(Subscriber):
 
+    # Subscriber delays restart on every event, a drag would never redraw
+    # until the pointer stops. The events come straight through and the
+    # throttles in build() pace the redraws instead
+    glyphEditorDidMouseDragDelay = 0
+    glyphEditorGlyphDidChangeDelay = 0
+
     def build(self):
         glyphEditor = self.getGlyphEditor()
         self.container = glyphEditor.extensionContainer(CONTAINER_KEY, location="background")
@@ -894,6 +1423,13 @@ class StrokeScribblerDrawingBot(Subscriber):
             strokeWidth=None,
             fillColor=None,
         )
+        # The pools grow at their own pace, each keeps to its own container
+        # so squiggles always stack above the contour outlines
+        self.squigglesLayer = self.container.appendPathSublayer(
+            strokeColor=None,
+            strokeWidth=None,
+            fillColor=None,
+        )
 
         self.thickness = 1
         self.distance = 40
@@ -904,40 +1440,145 @@ class StrokeScribblerDrawingBot(Subscriber):
         self.contours = []
         self.color = (0,0,1,1)
         self.currentGlyph = RGlyph(glyphEditor.getGlyph())
+        # Built once, every redraw used to refill its gradient table from scratch
+        self._pnf = PerlinNoiseFactory(2, octaves=4, tile=PERLIN_TILE)
+        # Flattened (and displaced) contours keyed by their outline and settings,
+        # so a redraw only recomputes the contours that actually changed
+        self._flattenCache = lru_cache(maxsize=512)(self._flattenContour)
+        # Their Quartz paths, only ever built on the main thread in draw()
+        self._pathCache = lru_cache(maxsize=512)(self._contourPath)
+        # Contour pairs of the current glyph, see cachedContourPairs()
+        self._contourPairs = None
+        self._contourPairsKey = None
+        # Pair key the window was last sent reset_glyph for, see postGlyphReset()
+        self._resetPairsKey = None
+        # What the last draw() was computed from, see drawSignature()
+        self._drawSignature = None
+        # Contours the window was last sent, see postContours()
+        self._postedContours = None
+        # Redraw at most ~30 times a second while dragging, every 100 ms for
+        # other edits, the last change always gets drawn
+        self._dragRedraws = Throttle(self.redrawGlyph, 0.033)
+        self._changeRedraws = Throttle(self.redrawGlyph, 0.1)
+        # Sublayers are kept between draws, unused ones are only hidden
+        self._contourLayers = []
+        self._squiggleLayers = []
+        # (color, width) each squiggle layer was last given
+        self._squiggleStyles = []
 
 
     def destroy(self):
+        self._dragRedraws.cancel()
+        self._changeRedraws.cancel()
+        self._flattenCache.cache_clear()
+        self._pathCache.cache_clear()
+        self._contourPairs = None
+        self._contourPairsKey = None
+        self._contourLayers = []
+        self._squiggleLayers = []
+        self._squiggleStyles = []
         self.container.clearSublayers()
 
 
-    def drawContour(self, contour, color, stroke_size, seg_length, random, amount=None, side="one"):
+    def pooledLayer(self, container, pool, index, **kwargs):
+        if index == len(pool):
+            pool.append(container.appendPathSublayer(**kwargs))
+        layer = pool[index]
+        layer.setVisible(True)
+        return layer
+
+
+    def hideUnusedLayers(self, pool, used):
+        for layer in pool[used:]:
+            layer.setVisible(False)
+
+
+    def _flattenContour(self, recording, seg_length, random):
+        if isinstance(seg_length, tuple):
+            seg_length = dict(seg_length)
         glyph = Glyph()
-        outputPen = glyph.getPen()
+        # Displaced as the flattened points stream through, rather than
+        # flattening into the glyph and redrawing it through perlinGlyph.
+        # Even without noise every point moves to the middle of its edge.
+        # The perlin pens add the closing edge only when the last flattened
+        # point isn't exactly the first one, where the glyph used to drop
+        # that duplicate before perlinGlyph closed the contour
+        outputPen = perlinPen(glyph.getPen(), random * 10, self._pnf)
         distancePen = StrokeFlattener(outputPen, approximateSegmentLength=seg_length)
-        contour.draw(distancePen)
-        pnf = PerlinNoiseFactory(2, octaves=4, tile=(1000/600, 1000/600))
-        perlinGlyph(glyph, random * 10, pnf)
-        flat = glyph[0] 
+        replayRecording(recording, distancePen)
+        flat = glyph[0]
+        points = np.fromiter(
+            (value for point in flat for value in (point.x, point.y)),
+            dtype=np.float64,
+            count=2 * len(flat),
+        ).reshape(-1, 2)
+        points.setflags(write=False)
+        return points, distancePen.segmentRefrenceMap
+
+
+    def _contourPath(self, recording, seg_length, random):
+        points = self.flattenContour(recording, seg_length, random)[0]
+        path = CGPathCreateMutable()
+        CGPathAddLines(path, None, points.tolist(), len(points))
+        if recording[-1][0] == "closePath":
+            CGPathCloseSubpath(path)
+        return path
+
+
+    def cachedContourPairs(self, glyph):
+        """
+        `getContourPairs` for `glyph`, only recomputed when its contours or
+        the pair settings stored in its lib change
+        """
+        data = glyph.lib.get(KEY) or {}
+        key = (
+            glyph.naked(),
+            tuple(contour.naked() for contour in glyph.contours),
+            sorted((name, tuple(item)) for name, item in data.items()),
+        )
+        if key != self._contourPairsKey:
+            self._contourPairs = getContourPairs(glyph)
+            self._contourPairsKey = key
+        return self._contourPairs
+
+
+    def flattenContour(self, recording, seg_length, random):
+        if isinstance(seg_length, dict):
+            seg_length = tuple(sorted(seg_length.items()))
+        # The cached values are shared between draws, treat them as read only
+        return self._flattenCache(recording, seg_length, random)
 
-        layer = self.contoursLayer.appendPathSublayer(
-            fillColor=None,
-            strokeColor=None,
-            strokeWidth=1,
-            )
-        p = flat.getRepresentation("merz.CGPath")
-        layer.setPath(p)
-        return ([(point.x, point.y) for point in flat], distancePen.segmentRefrenceMap)
+
+    def contourPath(self, recording, seg_length, random):
+        if isinstance(seg_length, dict):
+            seg_length = tuple(sorted(seg_length.items()))
+        return self._pathCache(recording, seg_length, random)
+
+
+    def flattenPair(self, recordings, seg_length, random):
+        # The second contour is resampled with the segment counts of the first
+        first = self.flattenContour(recordings[0], seg_length, random)
+        second = self.flattenContour(recordings[1], first[1], random)
+        return first, second
+
+
+    def drawContour(self, path, layer):
+        # A cache hit hands back the same path the layer already shows
+        if layer.getPath() is not path:
+            layer.setPath(path)
 
 
     def glyphEditorDidSetGlyph(self, info):
+        previous = self.currentGlyph
         self.currentGlyph = info['glyph']
+        # Outlines of the previous glyph won't come back any time soon, unless
+        # the editor was only handed a new wrapper of the same glyph
+        if previous is None or self.currentGlyph is None or previous.naked() is not self.currentGlyph.naked():
+            self._flattenCache.cache_clear()
+            self._pathCache.cache_clear()
         if self.currentGlyph is not None:
-            lib = self.currentGlyph.lib.get(KEY)
-            if lib:
-                parsed = {name:item for name,item in lib.items() if len(item) == 5}
-                # self.currentGlyph.lib[KEY] = parsed
             self.selectionIndexes = []
-            postEvent(DRAW_EVENT_KEY, reset_glyph=self.currentGlyph)
+            self.postGlyphReset(force=True)
             self.draw()
 
 
@@ -945,161 +1586,272 @@ class StrokeScribblerDrawingBot(Subscriber):
         self.currentGlyph = info['glyph']
         if self.currentGlyph is not None:
             if self.currentGlyph.selectedContours:
-                postEvent(DRAW_EVENT_KEY, contours=self.currentGlyph)
+                # Only the table selection needs updating, the window keeps
+                # the stitched contours it was sent
+                postEvent(DRAW_EVENT_KEY, selection_changed=True)
 
 
     def glyphEditorGlyphDidChange(self, info):
         self.currentGlyph = info['glyph']
         if self.currentGlyph is not None:
-            postEvent(DRAW_EVENT_KEY, reset_glyph=self.currentGlyph)
-            self.draw()
+            self._changeRedraws.call()
 
         
     def glyphEditorDidMouseDrag(self, info):
         self.currentGlyph = info['glyph']
         if self.currentGlyph is not None:
-            postEvent(DRAW_EVENT_KEY, reset_glyph=self.currentGlyph)
+            self._dragRedraws.call()
+
+
+    def redrawGlyph(self):
+        # Run by the throttles, the glyph may be gone by the time it fires
+        if self.currentGlyph is not None:
+            self.postGlyphReset()
             self.draw()
 
 
-    def draw(self, isSelected=False):
-        # Draw the interpolated glyph outlines
-        self.contoursLayer.clearSublayers()
-        if self.preview:
-            self.contours = []
-            if self.currentGlyph:
-
-                selIDs = getSelectedPair(self.currentGlyph)
-                cps = getContourPairs(self.currentGlyph)
-                for c in cps:
-
-                    parsedContours = c[0]
-                    cinfo          = c[1]
-                    cont1,cont2    = parsedContours
-
-                    if isSelected:
-                        fill = (0,0,1,1)
-
-                    fill   = self.color
-                    mid    = cinfo[0]
-                    segs   = cinfo[1]
-                    side   = cinfo[2]
-                    offset = cinfo[3]
-                    random = cinfo[4]
-                    ps1,ref = self.drawContour(
-                                            contour     = cont1,
-                                            color       = (0,0,1,1),
-                                            stroke_size = 3,
-                                            seg_length  = segs,
-                                            random      = random,
-                                            side        = "one"
-                                        )
-                    ps2,_ = self.drawContour(
-                                            contour     = cont2,
-                                            color       = (0.0, 0.9811, 0.5737, 1.0),
-                                            stroke_size = 3,
-                                            seg_length  = ref,
-                                            random      = random,
-                                            side        = "two"
-                                        )
-                    if side:
-                        ps1,ps2 = ps2,ps1
-
-                    squiggle = self.contoursLayer.appendPathSublayer(
-                        strokeColor = fill,
-                        strokeWidth = mid,
-                        fillColor   = None,
-                        strokeCap   = "round",
-                        strokeJoin  = "round",
-                        )
-                    pen = squiggle.getPen()
+    def postGlyphReset(self, force=False):
+        # The window reparses its pair table on reset_glyph, moving points
+        # around leaves the glyph, its contours and their pairs as they were.
+        # Settings the window writes itself are already patched in its cache,
+        # only a change of glyph, contours or pair names needs a reset
+        self.cachedContourPairs(self.currentGlyph)
+        glyph, contours, items = self._contourPairsKey
+        key = (glyph, contours, tuple(name for name, _ in items))
+        if force or key != self._resetPairsKey:
+            postEvent(DRAW_EVENT_KEY, reset_glyph=self.currentGlyph)
+            self._resetPairsKey = key
+
+
+    def drawSignature(self):
+        # Everything draw() reads: the outlines, the pair settings stored
+        # in the lib and the preview options
+        glyph = self.currentGlyph
+        if glyph is None:
+            return (None, self.preview, self.color)
+        recorder = RecordingPen()
+        glyph.draw(recorder)
+        data = glyph.lib.get(KEY) or {}
+        return (
+            glyph.naked(),
+            tuple(contour.identifier for contour in glyph.contours),
+            recorder.value,
+            sorted((name, tuple(item)) for name, item in data.items()),
+            self.preview,
+            self.color,
+        )
 
-                    it = []
-                    pen.moveTo(ps1[0])
-                    it.append(ps1[0])
 
-                    for i, ps in enumerate(ps1):
-                        try:
-                            ops = ps2[i + offset]
-                            pen.lineTo(ops)
-                            pen.lineTo(ps)
-                            it.append(ops)
-                            it.append(ps)
-                        except IndexError:
-                            pass
+    def draw(self, isSelected=False):
+        # With the preview off the layers only need hiding once, there is
+        # no point in recording the outline on every drag
+        if not self.preview:
+            if self._drawSignature is not None:
+                self._drawSignature = None
+                self.hideUnusedLayers(self._contourLayers, 0)
+                self.hideUnusedLayers(self._squiggleLayers, 0)
+            self.postContours()
+            return
 
-                    pen.endPath()
-                    self.contours.append(it)
+        # Nothing moved since the last draw, the layers are still up to date
+        signature = (self.drawSignature(), isSelected)
+        if signature == self._drawSignature:
+            self.postContours()
+            return
+        self._drawSignature = signature
+
+        # Draw the interpolated glyph outlines
+        contourIndex = 0
+        squiggleIndex = 0
+        self.contours = []
+        if self.currentGlyph:
 
-        postEvent(DRAW_EVENT_KEY, contours=self.contours)
+            cps = self.cachedContourPairs(self.currentGlyph)
+            contourLayerSettings = dict(
+                fillColor=None,
+                strokeColor=None,
+                strokeWidth=1,
+                )
+            jobs = []
+            for (cont1, cont2), cinfo in cps:
+                recordings = []
+                for contour in (cont1, cont2):
+                    recorder = RecordingPen()
+                    contour.draw(recorder)
+                    recordings.append(tuple(recorder.value))
+                jobs.append((recordings, cinfo[1], cinfo[4]))
+            flattened = [self.flattenPair(*job) for job in jobs]
+
+            fill = SELECTED_COLOR if isSelected else self.color
+            pooledLayer = self.pooledLayer
+            contoursLayer = self.contoursLayer
+            squigglesLayer = self.squigglesLayer
+            drawContour = self.drawContour
+            contourPath = self.contourPath
+            contourLayers = self._contourLayers
+            squiggleLayers = self._squiggleLayers
+            squiggleStyles = self._squiggleStyles
+            contours = self.contours
+            for c, job, (first, second) in zip(cps, jobs, flattened):
+
+                cinfo          = c[1]
+
+                mid    = cinfo[0]
+                side   = cinfo[2]
+                offset = cinfo[3]
+                (recording1, recording2), seg_length, random = job
+                ps1, refmap = first
+                ps2, _ = second
+                path1 = contourPath(recording1, seg_length, random)
+                path2 = contourPath(recording2, refmap, random)
+                drawContour(path1, pooledLayer(contoursLayer, contourLayers, contourIndex, **contourLayerSettings))
+                drawContour(path2, pooledLayer(contoursLayer, contourLayers, contourIndex + 1, **contourLayerSettings))
+                contourIndex += 2
+                if side:
+                    ps1,ps2 = ps2,ps1
+
+                squiggle = pooledLayer(
+                    squigglesLayer,
+                    squiggleLayers,
+                    squiggleIndex,
+                    strokeColor = fill,
+                    strokeWidth = mid,
+                    fillColor   = None,
+                    strokeCap   = "round",
+                    strokeJoin  = "round",
+                    )
+                # Only push the stroke style to the layer when it changed,
+                # merz converts the color on every set
+                style = (fill, mid)
+                if squiggleIndex == len(squiggleStyles):
+                    squiggleStyles.append(style)
+                elif squiggleStyles[squiggleIndex] != style:
+                    squiggle.setStrokeColor(fill)
+                    squiggle.setStrokeWidth(mid)
+                    squiggleStyles[squiggleIndex] = style
+                squiggleIndex += 1
+
+                stitched = _stitch(ps1, ps2, offset)
+                # Shared with the window from here on
+                stitched.setflags(write=False)
+
+                # One open polyline, handed to Quartz in a single call
+                path = CGPathCreateMutable()
+                CGPathAddLines(path, None, stitched.tolist(), len(stitched))
+                squiggle.setPath(path)
+                contours.append(stitched)
+
+        self.hideUnusedLayers(self._contourLayers, contourIndex)
+        self.hideUnusedLayers(self._squiggleLayers, squiggleIndex)
+        self.postContours()
+
+
+    def postContours(self):
+        # The window rebuilds its table for every post, leave it alone when
+        # it already holds these contours
+        posted = self._postedContours
+        if posted is None or len(posted) != len(self.contours) or not all(
+            np.array_equal(contour, other) for contour, other in zip(self.contours, posted)
+        ):
+            postEvent(DRAW_EVENT_KEY, contours=self.contours)
+            self._postedContours = self.contours
 
 
     # Thanks to Erik van Blokland for the following 3 methods
     # for extracting cross-class values
     def settingsChanged(self, info):
-        if info["thickness_value"] is not None:
-            self.thickness = info["thickness_value"]
-        if info["distance_value"] is not None:
-            self.distance = info["distance_value"]
-        if info["side_value"] is not None:
-            self.side = info["side_value"]
-        if info["offset_value"] is not None:
-            self.offset = info["offset_value"]
-        if info["random_value"] is not None:
-            self.random = info["random_value"]
-        if info["show_preview"] is not None:
-            self.preview = info["show_preview"]        
-        if info["color_value"] is not None:
-            self.color = info["color_value"]        
+        changed = bool(info["draw"])
+        for key, attribute in SETTINGS_ATTRIBUTES:
+            value = info[key]
+            if value is None:
+                continue
+            if key == "color_value":
+                value = tuple(value)
+            if getattr(self, attribute) != value:
+                setattr(self, attribute, value)
+                changed = True
+        # Only the triggering key is set on most events, and a slider that
+        # comes back to its value doesn't need a new preview
+        if not changed:
+            return
+        # The window asked, it gets the contours even if they are the same
+        self._postedContours = None
         self.draw()
 
 
-def infoSettingsExtractor(subscriber, info):
-    info["thickness_value"] = None
-    info["distance_value"] = None
-    info["side_value"] = None
-    info["offset_value"] = None
-    info["random_value"] = None
-    info["show_preview"] = None
-    info["color_value"] = None
-    for lowLevelEvent in info["lowLevelEvents"]:
-        info["thickness_value"] = lowLevelEvent.get("thickness_value")
-        info["distance_value"] = lowLevelEvent.get("distance_value")
-        info["side_value"] = lowLevelEvent.get("side_value")
-        info["offset_value"] = lowLevelEvent.get("offset_value")
-        info["random_value"] = lowLevelEvent.get("random_value")
-        info["show_preview"] = lowLevelEvent.get("show_preview")
-        info["color_value"] = lowLevelEvent.get("color_value")
+SETTINGS_VALUES = (
+    "thickness_value",
+    "distance_value",
+    "side_value",
+    "offset_value",
+    "random_value",
+    "show_preview",
+    "color_value",
+    "draw",
+)
 
+# Event values `settingsChanged` copies onto the drawing bot
+SETTINGS_ATTRIBUTES = (
+    ("thickness_value", "thickness"),
+    ("distance_value", "distance"),
+    ("side_value", "side"),
+    ("offset_value", "offset"),
+    ("random_value", "random"),
+    ("show_preview", "preview"),
+    ("color_value", "color"),
+)
 
-def drawingSettingsExtractor(subscriber, info):
-    info["contours"] = None
-    info["reset_glyph"] = None
-    for lowLevelEvent in info["lowLevelEvents"]:
-        info["contours"] = lowLevelEvent.get("contours")
-        info["reset_glyph"] = lowLevelEvent.get("reset_glyph")
-
-
-registerSubscriberEvent(
-    subscriberEventName=UI_EVENT_KEY,
-    methodName="settingsChanged",
-    lowLevelEventNames=[UI_EVENT_KEY],
-    eventInfoExtractionFunction=infoSettingsExtractor,
-    dispatcher="roboFont",
-    delay=0,
-    debug=True
+DRAWING_VALUES = (
+    "contours",
+    "reset_glyph",
+    "selection_changed",
 )
 
 
-registerSubscriberEvent(
-    subscriberEventName=DRAW_EVENT_KEY,
-    methodName="drawingSettingsChanged",
-    lowLevelEventNames=[DRAW_EVENT_KEY],
-    eventInfoExtractionFunction=drawingSettingsExtractor,
-    dispatcher="roboFont",
-    delay=0,
-    debug=True
-)
+def extractLatestValues(info, keys):
+    # Only the newest value of every key matters. Looking for it per key, rather
+    # than letting the last event overwrite everything, keeps values that
+    # earlier events of a coalesced burst posted on their own
+    events = info["lowLevelEvents"]
+    if len(events) == 1:
+        # The usual case with delay=0, no need to look any further
+        event = events[0]
+        for key in keys:
+            info[key] = event.get(key)
+        return
+    for key in keys:
+        info[key] = next((event[key] for event in reversed(events) if event.get(key) is not None), None)
+
+
+def infoSettingsExtractor(subscriber, info):
+    extractLatestValues(info, SETTINGS_VALUES)
+
+
+def drawingSettingsExtractor(subscriber, info):
+    extractLatestValues(info, DRAWING_VALUES)
+
+
+def registerEvents():
+    # Called by the window the first time it opens rather than on import
+    registerSubscriberEvent(
+        subscriberEventName=UI_EVENT_KEY,
+        methodName="settingsChanged",
+        lowLevelEventNames=[UI_EVENT_KEY],
+        eventInfoExtractionFunction=infoSettingsExtractor,
+        dispatcher="roboFont",
+        delay=0,
+        debug=True
+    )
+
+    registerSubscriberEvent(
+        subscriberEventName=DRAW_EVENT_KEY,
+        methodName="drawingSettingsChanged",
+        lowLevelEventNames=[DRAW_EVENT_KEY],
+        eventInfoExtractionFunction=drawingSettingsExtractor,
+        dispatcher="roboFont",
+        delay=0,
+        debug=True
+    )
 
 
 if __name__ == "__main__":